@@ -0,0 +1,39 @@
+import os
+import re
+import glob
+import pandas as pd
+
+# Collect the engagement score from every saved LLM response into
+# `<model>_score_<run>` and `<model>_score_mean` columns next to the sampled pairs.
+
+models = ["openai", "deepseek_chat", "deepseek_reasoner", "anthropic_sonnet", "anthropic_opus"]
+
+# Responses are JSON, sometimes wrapped in a ```json fence, so match the key directly
+score_pattern = re.compile(r'"score"\s*:\s*(\d)')
+
+
+def read_score(filename):
+    with open(filename, encoding="utf-8") as f:
+        match = score_pattern.search(f.read())
+    return int(match.group(1)) if match else None
+
+
+df = pd.read_csv("samples/30_pairs_dissent_1.csv")
+
+for model in models:
+    run_dirs = glob.glob(f"samples/{model}/responses_*")
+    run_indices = sorted(int(d.rsplit("_", 1)[1]) for d in run_dirs)
+    score_columns = []
+    for run_idx in run_indices:
+        column = f"{model}_score_{run_idx}"
+        scores = []
+        for i in df.index:
+            filename = os.path.join(f"samples/{model}/responses_{run_idx}", f"response_{i}.txt")
+            scores.append(read_score(filename) if os.path.exists(filename) else None)
+        df[column] = pd.array(scores, dtype="Int64")
+        score_columns.append(column)
+    if score_columns:
+        df[f"{model}_score_mean"] = df[score_columns].mean(axis=1)
+
+df.to_csv("samples/30_pairs_w_llm_scores.csv", index=False)
+print("30_pairs_w_llm_scores.csv saved with shape:", df.shape)
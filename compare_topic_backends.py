@@ -0,0 +1,105 @@
+import os
+import sys
+import json
+import argparse
+import subprocess
+import numpy as np
+import pandas as pd
+from scipy.stats import spearmanr, kendalltau
+from topic_backends import BACKENDS, topic_model_dir
+
+# ============================================================
+# Benchmark topic backends against the LDA baseline
+# ============================================================
+#
+# Fits each backend, the LDA baseline included, with topic_model_filtered.py
+# (one process per backend, nothing else running) under
+# results_filtered/topic_backend_runs/, then compares fit time, peak memory of
+# the fit and how well the pair KL divergences rank-correlate with the
+# baseline's. The pipeline's own topic_model_<n> runs are neither reused (they
+# may have been fitted alongside other stages) nor overwritten. Runs fitted in
+# isolation by an earlier comparison are reused unless named in --refit.
+#
+#   python compare_topic_backends.py --num-components 110
+#   python compare_topic_backends.py --num-components 110 --refit nmf      # re-fit only NMF
+#   python compare_topic_backends.py --num-components 110 --skip-fit       # report on existing runs
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--num-components", type=int, default=110)
+parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=BACKENDS)
+parser.add_argument("--baseline", choices=BACKENDS, default="lda")
+parser.add_argument("--refit", nargs="+", choices=BACKENDS, default=[], help="Fit these backends even if a run exists")
+parser.add_argument("--skip-fit", action="store_true", help="Only report on runs that already exist")
+parser.add_argument("--output", default="results_filtered/topic_backend_comparison.csv")
+args = parser.parse_args()
+
+backends = [args.baseline] + [b for b in args.backends if b != args.baseline]
+RUNS_ROOT = "results_filtered/topic_backend_runs"
+
+
+def has_isolated_run(backend):
+    output_dir = topic_model_dir(backend, args.num_components, RUNS_ROOT)
+    if not all(os.path.exists(os.path.join(output_dir, f)) for f in ["fit_stats.json", "kl_divergence_metadata.csv"]):
+        return False
+    with open(os.path.join(output_dir, "fit_stats.json")) as f:
+        return json.load(f).get("isolated", False)
+
+
+if not args.skip_fit:
+    for backend in backends:
+        if has_isolated_run(backend) and backend not in args.refit:
+            print(f"=== Reusing the existing {backend} run with {args.num_components} topics ===")
+            continue
+        print(f"=== Fitting {backend} with {args.num_components} topics ===")
+        subprocess.run(
+            [sys.executable, "topic_model_filtered.py", "--backend", backend,
+             "--num-components", str(args.num_components), "--output-root", RUNS_ROOT, "--isolated"],
+            check=True,
+        )
+
+
+def load_run(backend):
+    output_dir = topic_model_dir(backend, args.num_components, RUNS_ROOT)
+    with open(os.path.join(output_dir, "fit_stats.json")) as f:
+        stats = json.load(f)
+    kl_df = pd.read_csv(os.path.join(output_dir, "kl_divergence_metadata.csv"))
+    return stats, kl_df
+
+
+baseline_stats, baseline_kl = load_run(args.baseline)
+merge_keys = ["case_key", "majority_opinion_label", "dissent_opinion_label"]
+
+rows = []
+for backend in backends:
+    stats, kl_df = load_run(backend)
+    paired = baseline_kl.merge(kl_df, on=merge_keys, suffixes=("_baseline", ""))
+    baseline_scores = paired["kl_divergence_baseline"].to_numpy()
+    scores = paired["kl_divergence"].to_numpy()
+
+    # Share of the baseline's most divergent decile that the backend also ranks in its top decile
+    top_n = max(1, len(paired) // 10)
+    top_baseline = set(np.argsort(-baseline_scores, kind="stable")[:top_n])
+    top_backend = set(np.argsort(-scores, kind="stable")[:top_n])
+
+    rows.append({
+        "backend": backend,
+        "num_components": args.num_components,
+        "documents": stats["documents"],
+        "vocabulary": stats["vocabulary"],
+        "fit_seconds": round(stats["fit_seconds"], 2),
+        "speedup_vs_baseline": round(baseline_stats["fit_seconds"] / stats["fit_seconds"], 2),
+        # PSS of the fitting process and its workers (None where /proc is unavailable)
+        "peak_pss_mb": round(stats["peak_pss_mb"], 1) if stats["peak_pss_mb"] is not None else np.nan,
+        "fit_pss_increase_mb": (
+            round(stats["peak_pss_mb"] - stats["pss_before_fit_mb"], 1) if stats["peak_pss_mb"] is not None else np.nan
+        ),
+        "pairs": len(paired),
+        "kl_spearman": round(spearmanr(baseline_scores, scores).statistic, 4),
+        "kl_kendall": round(kendalltau(baseline_scores, scores).statistic, 4),
+        "top_decile_overlap": round(len(top_baseline & top_backend) / top_n, 4),
+    })
+
+comparison_df = pd.DataFrame(rows)
+comparison_df.to_csv(args.output, index=False)
+print(comparison_df.to_string(index=False))
+print(f"\nSaved to {args.output}")
@@ -1,7 +1,6 @@
 import os
 import gensim
 from gensim.models.doc2vec import Doc2Vec, TaggedDocument
-from nltk.tokenize import word_tokenize
 import string
 import json
 import numpy as np
@@ -14,21 +13,9 @@ output_dir = "results_filtered/doc2vec/"
 os.makedirs(output_dir, exist_ok=True)
 
 
-def preprocess_text(text):
-    
-    # Tokenize text into words
-    all_words = [word.lower() for word in word_tokenize(text)]
-    
-    # Filter out words containing non-alphabetic characters
-    word_tokens = [word for word in all_words if word.isalpha()]
-    
-    return word_tokens
-
-
-# Load `pair_metadata.csv` (Filtered cases with majority length > 50)
-pair_metadata_df = pd.read_csv("results_filtered/pair_metadata.csv")
-pair_metadata_df["majority_text"] = pair_metadata_df["majority_text"].apply(preprocess_text)
-pair_metadata_df["dissent_text"] = pair_metadata_df["dissent_text"].apply(preprocess_text)
+# Load shared tokens of `pair_metadata.csv` (written by preprocess_filtered.py)
+pair_metadata_df = pd.read_pickle("results_filtered/pair_tokens.pkl")
+pair_metadata_df = pair_metadata_df.rename(columns={"majority_tokens": "majority_text", "dissent_tokens": "dissent_text"})
 
 # Create Corpus and Opinion Label Mapping
 corpus = []
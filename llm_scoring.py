@@ -0,0 +1,115 @@
+import os
+import json
+import time
+import argparse
+import pandas as pd
+from shard_utils import select_shard, sampler_dir
+from opinion_archive import ARCHIVE_PATH, OpinionArchive
+
+# ============================================================
+# Scoring loop shared by the LLM sampler scripts
+# ============================================================
+#
+# The rubric prompt, the command-line options and the loop over runs and pairs
+# used by openai_sample.py, deepseek_sample_*.py and anthropic_sample_*.py.
+# load_test.py runs those scripts unchanged, so what it measures is this loop.
+
+LLM_SAMPLE = "samples/30_pairs_dissent_1.csv"
+SYSTEM_PROMPT = "You are an expert legal analyst evaluating Supreme Court opinions."
+
+
+def build_prompt(majority_text, dissent_text, apostrophe="’"):
+    """
+    The 1–5 "talking with" / "talking past" rubric for one pair. The Anthropic
+    samplers were run with straight apostrophes (apostrophe="'").
+    """
+    return (
+        "You will be provided with a U.S. Supreme Court opinion, which consists of a majority opinion and a dissenting opinion. "
+        "Your task is to evaluate the extent to which the dissent is 'talking with' the majority opinion or 'talking past' it.\n\n"
+        "Definitions:\n"
+        f"Talking with (High Score: 5): The dissent directly engages with the majority{apostrophe}s reasoning, addresses specific legal arguments, "
+        "and attempts to rebut the key points in a way that demonstrates meaningful dialogue.\n"
+        "Talking past (Low Score: 1): The dissent focuses on different issues, ignores key majority reasoning, "
+        "or relies on a separate legal framework with little direct engagement.\n\n"
+        "Scoring Criteria (1–5 Scale):\n"
+        f"5 – Strong engagement: The dissent thoroughly addresses the majority{apostrophe}s reasoning, cites the same precedents and statutory interpretations, "
+        "and provides a detailed rebuttal.\n"
+        f"4 – Substantial engagement: The dissent engages significantly with the majority{apostrophe}s reasoning, responding to key points, but may also introduce broader concerns.\n"
+        f"3 – Moderate engagement: The dissent addresses some of the majority{apostrophe}s arguments but also shifts focus to independent issues or alternative perspectives.\n"
+        f"2 – Minimal engagement: The dissent briefly acknowledges the majority{apostrophe}s reasoning but mostly introduces independent legal arguments.\n"
+        "1 – No engagement: The dissent is largely unrelated to the majority opinion, relying on a completely separate framework or ignoring key points.\n\n"
+        f"Majority:\n{majority_text}\n\nDissent:\n{dissent_text}\n\n"
+        "Return only a JSON object with two keys: 'score' (integer from 1 to 5) and 'reasoning' (a short explanation)."
+    )
+
+
+def sampler_args(model, base_url_env, default_base_url):
+    """
+    Options of a sampler script. Refuses to write into samples/<model> while
+    `base_url_env` points the client somewhere other than the real API (e.g. at
+    mock_llm_server.py), so test responses never replace the published ones.
+    """
+    parser = argparse.ArgumentParser(description=f"Score the sampled pairs with {model}.")
+    # Optional sharding: score only this worker's share of the pairs (see shard_utils.py)
+    parser.add_argument("--shard", type=int, default=0)
+    parser.add_argument("--num-shards", type=int, default=1)
+    parser.add_argument("--sample", default=LLM_SAMPLE)
+    parser.add_argument("--archive", default=ARCHIVE_PATH)
+    parser.add_argument("--output-dir", default=f"samples/{model}")
+    parser.add_argument("--num-runs", type=int, help="Override the script's number of runs")
+    parser.add_argument("--timings", help="Append one JSON line per request (start, seconds, outcome) to this file")
+    args = parser.parse_args()
+
+    base_url = os.environ.get(base_url_env, default_base_url).rstrip("/")
+    if base_url != default_base_url.rstrip("/") and os.path.normpath(args.output_dir) == os.path.normpath(f"samples/{model}"):
+        parser.error(f"{base_url_env}={base_url} is not the real API; pass --output-dir so these responses "
+                     f"do not overwrite samples/{model}")
+    return args
+
+
+def run_sampler(args, request, num_runs, apostrophe="’"):
+    """
+    Score every pair of the sample `num_runs` times with `request(prompt) -> text`,
+    saving responses_<run>/response_<i>.txt. Returns the number of failed requests.
+    """
+    # Opinion texts are fetched from the archive (opinion_archive.py), so skip them in the CSV
+    df = pd.read_csv(args.sample, usecols=lambda c: not c.endswith("_text"))
+    df = select_shard(df, args.shard, args.num_shards)
+    archive = OpinionArchive(args.archive)
+    failed = 0
+
+    for run_idx in range(args.num_runs if args.num_runs is not None else num_runs):
+        output_dir = os.path.join(sampler_dir(args.output_dir, args.shard, args.num_shards), f"responses_{run_idx}")
+        os.makedirs(output_dir, exist_ok=True)
+        print(f"\n=== Starting run {run_idx}, saving to {output_dir} ===\n")
+
+        for i, row in df.iterrows():
+            majority_text = archive.get(row['case_key'], "majority")
+            dissent_text = archive.get(row['case_key'], f"dissent{row['dissent_ind']}")
+            prompt = build_prompt(majority_text, dissent_text, apostrophe)
+
+            started_at = time.time()
+            start = time.perf_counter()
+            try:
+                result_text = request(prompt).strip()
+                outcome = "ok"
+
+                # --- Save each response ---
+                filename = os.path.join(output_dir, f"response_{i}.txt")
+                with open(filename, "w", encoding="utf-8") as f:
+                    f.write(f"Official Citation: {row['official citation']}\n\n")
+                    f.write(result_text)
+
+                print(f"Saved response to {filename}")
+
+            except Exception as e:
+                print(f"Error processing row {i} in run {run_idx}: {e}")
+                outcome = type(e).__name__
+                failed += 1
+
+            if args.timings:
+                with open(args.timings, "a") as f:
+                    f.write(json.dumps({"start": started_at, "seconds": time.perf_counter() - start, "outcome": outcome}) + "\n")
+
+    archive.close()
+    return failed
@@ -0,0 +1,183 @@
+import os
+import sys
+import json
+import time
+import argparse
+import shutil
+import tempfile
+import threading
+import subprocess
+import urllib.request
+import numpy as np
+import pandas as pd
+from sharding import LLM_SAMPLERS
+from llm_scoring import LLM_SAMPLE
+from opinion_archive import ARCHIVE_PATH, build_archive
+
+# ============================================================
+# Load test for the LLM scoring step
+# ============================================================
+#
+# Runs a sampler script itself (llm_scoring.run_sampler: the same prompt, loop,
+# SDK client and retries) split over N local shard processes, as
+# `sharding.py local` does, for several N. It reports throughput and latency
+# percentiles per level from the samplers' per-request timings. Throughput is
+# taken over the window from the first request's start to the last request's
+# end, so interpreter start-up is not counted.
+#
+# A level is a shard count, not a number of requests in flight: each sampler
+# process sends one request at a time, and pairs are split by a hash of
+# case_key, so shards get uneven loads (30 pairs over 16 shards gives 0 to 4
+# pairs each). `busiest_shard` reports the most requests sent by one shard.
+#
+# Point it at mock_llm_server.py to compare scheduling or client changes offline:
+#
+#   python mock_llm_server.py --latency lognormal:1.0,0.6 --tpm 2000000 --error-rate 0.02 &
+#   python load_test.py --sampler openai --base-url http://127.0.0.1:8000 --concurrency 1 4 16
+#
+# --start-mock runs the mock server in-process instead (forwarding --mock-args).
+# Responses are written to a scratch directory, never to samples/.
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def prepare_inputs(args, workdir):
+    """(sample CSV, archive) to score: the real ones if present, else synthetic pairs of similar size."""
+    if os.path.exists(args.sample) and os.path.exists(args.archive):
+        return os.path.abspath(args.sample), os.path.abspath(args.archive)
+    filler = "The Court holds that the statute does not apply. "
+    text = (filler * (args.synthetic_chars // len(filler) + 1))[:args.synthetic_chars]
+    sample_df = pd.DataFrame({
+        "case_key": [f"synthetic{i}" for i in range(args.synthetic_pairs)],
+        "dissent_ind": 1,
+        "official citation": [f"{i} U.S. 1" for i in range(args.synthetic_pairs)],
+        "majority_text": text,
+        "dissent_text": text[: args.synthetic_chars // 2],
+    })
+    sample_path = os.path.join(workdir, "synthetic_sample.csv")
+    archive_path = os.path.join(workdir, "synthetic_sample.zarc")
+    sample_df.to_csv(sample_path, index=False)
+    build_archive(sample_path, archive_path)
+    return sample_path, archive_path
+
+
+def server_stats(stats_url):
+    """Request counters from mock_llm_server.py, or None for a real endpoint."""
+    try:
+        with urllib.request.urlopen(stats_url, timeout=5) as r:
+            return json.load(r)
+    except Exception:
+        return None
+
+
+def run_level(args, concurrency, sample_path, archive_path, workdir, env):
+    """Run the sampler as `concurrency` shard processes; wall time, per-shard timing records, exit codes."""
+    level_dir = os.path.join(workdir, f"concurrency_{concurrency}")
+    # Samplers append to their timings file, so start each level from scratch
+    shutil.rmtree(level_dir, ignore_errors=True)
+    os.makedirs(level_dir)
+    timing_files = [os.path.join(level_dir, f"timings_{shard}.jsonl") for shard in range(concurrency)]
+
+    start = time.perf_counter()
+    procs = []
+    for shard in range(concurrency):
+        with open(os.path.join(level_dir, f"shard_{shard}.log"), "w") as log:
+            procs.append(subprocess.Popen(
+                [sys.executable, LLM_SAMPLERS[args.sampler], "--shard", str(shard), "--num-shards", str(concurrency),
+                 "--sample", sample_path, "--archive", archive_path, "--output-dir", os.path.join(level_dir, "responses"),
+                 "--num-runs", str(args.num_runs), "--timings", timing_files[shard]],
+                cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT,
+            ))
+    exit_codes = [p.wait() for p in procs]
+    wall = time.perf_counter() - start
+
+    shard_records = []
+    for path in timing_files:
+        records = []
+        if os.path.exists(path):
+            with open(path) as f:
+                records = [json.loads(line) for line in f]
+        shard_records.append(records)
+    return wall, shard_records, exit_codes
+
+
+def summarize(concurrency, wall, shard_records, attempts, exit_codes):
+    records = [r for shard in shard_records for r in shard]
+    latencies = np.array([r["seconds"] for r in records if r["outcome"] == "ok"])
+    errors = pd.Series([r["outcome"] for r in records if r["outcome"] != "ok"], dtype=object).value_counts().to_dict()
+    pct = lambda q: float(np.percentile(latencies, q)) if len(latencies) else float("nan")
+    # Active window: first request start to last request end, across all shard processes
+    window = max(r["start"] + r["seconds"] for r in records) - min(r["start"] for r in records) if records else 0.0
+    return {
+        "concurrency": concurrency,
+        "requests": len(records),
+        "busiest_shard": max((len(shard) for shard in shard_records), default=0),
+        "ok": len(latencies),
+        "errors": sum(errors.values()),
+        "error_types": ";".join(f"{k}={v}" for k, v in sorted(errors.items())),
+        "attempts": attempts,
+        # Shards with no pairs or no failures exit 0; crashed shards report no timings
+        "failed_processes": sum(code != 0 for code in exit_codes),
+        "wall_s": round(wall, 3),
+        "window_s": round(window, 3),
+        "throughput_rps": round(len(latencies) / window, 3) if window else float("nan"),
+        "p50_s": round(pct(50), 3),
+        "p95_s": round(pct(95), 3),
+        "p99_s": round(pct(99), 3),
+        "max_s": round(float(latencies.max()), 3) if len(latencies) else float("nan"),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Throughput and tail latency of the LLM samplers at several concurrency levels.")
+    parser.add_argument("--sampler", choices=list(LLM_SAMPLERS), default="openai")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000",
+                        help="Server root; /v1 is appended for the OpenAI client")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16],
+                        help="Numbers of shard processes to run the sampler as (not requests in flight)")
+    parser.add_argument("--num-runs", type=int, default=1, help="Sampler runs over the sample per level")
+    parser.add_argument("--sample", default=LLM_SAMPLE)
+    parser.add_argument("--archive", default=ARCHIVE_PATH)
+    parser.add_argument("--synthetic-pairs", type=int, default=30, help="Pairs used when the sample or archive is missing")
+    parser.add_argument("--synthetic-chars", type=int, default=60000, help="Opinion size of the synthetic pairs")
+    parser.add_argument("--workdir", help="Scratch directory for responses and timings (default: a temp dir)")
+    parser.add_argument("--start-mock", action="store_true", help="Run mock_llm_server.py in-process")
+    parser.add_argument("--mock-args", default="", help='Arguments for the in-process mock, e.g. "--error-rate 0.05"')
+    parser.add_argument("--output", help="Also write the report to this CSV")
+    args = parser.parse_args()
+
+    if args.start_mock:
+        from mock_llm_server import build_parser as mock_parser, make_server
+        mock_args = mock_parser().parse_args(args.mock_args.split() + ["--port", "0"])
+        server = make_server(mock_args)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        root = f"http://127.0.0.1:{server.server_address[1]}"
+    else:
+        root = args.base_url.rstrip("/")
+        root = root[:-3] if root.endswith("/v1") else root
+
+    # The samplers read their endpoints and keys from the environment
+    env = dict(os.environ, OPENAI_BASE_URL=root + "/v1", DEEPSEEK_BASE_URL=root, ANTHROPIC_BASE_URL=root)
+    for key in ["OPENAI_API_KEY", "DEEPSEEK_API_KEY", "ANTHROPIC_API_KEY"]:
+        env.setdefault(key, "mock")
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="load_test_")
+    os.makedirs(workdir, exist_ok=True)
+    sample_path, archive_path = prepare_inputs(args, workdir)
+    print(f"{LLM_SAMPLERS[args.sampler]} on {sample_path} x {args.num_runs} runs against {root} (scratch: {workdir})")
+
+    rows = []
+    for concurrency in args.concurrency:
+        before = server_stats(root + "/stats")
+        wall, shard_records, exit_codes = run_level(args, concurrency, sample_path, archive_path, workdir, env)
+        after = server_stats(root + "/stats")
+        # Server-side request count includes SDK retries; only known for the mock
+        attempts = after.get("requests", 0) - before.get("requests", 0) if before is not None and after is not None else None
+        rows.append(summarize(concurrency, wall, shard_records, attempts, exit_codes))
+        print(rows[-1])
+
+    report = pd.DataFrame(rows)
+    print()
+    print(report.to_string(index=False))
+    if args.output:
+        report.to_csv(args.output, index=False)
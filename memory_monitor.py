@@ -0,0 +1,112 @@
+import os
+import sys
+import json
+import time
+import select
+import subprocess
+
+# Peak memory of a process tree while a block of code runs (fit_stats.json).
+#
+# A separate monitor process samples the proportional set size (PSS) of the
+# watched process and all its descendants (LdaMulticore workers, joblib
+# processes). PSS divides pages shared between forked workers among them, so
+# copy-on-write memory is counted once; summing RSS would count it per worker.
+# Sampling from outside keeps the monitor from competing with the fit for the
+# GIL. Needs /proc/<pid>/smaps_rollup (Linux); elsewhere the values are None.
+#
+#   with PeakMemory() as fit_memory:
+#       model.fit(...)
+#   fit_memory.before, fit_memory.peak   # bytes
+
+
+def _children_map():
+    """Parent pid -> child pids of every process, from /proc/<pid>/stat."""
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # The parent pid is the second field after the parenthesized command name
+        ppid = int(stat[stat.rindex(")") + 2:].split()[1])
+        children.setdefault(ppid, []).append(int(entry))
+    return children
+
+
+def _descendants(root_pid, exclude):
+    """`root_pid` and every process below it, except the subtree of `exclude`."""
+    children = _children_map()
+    pids, pending = [], [root_pid]
+    while pending:
+        pid = pending.pop()
+        if pid == exclude:
+            continue
+        pids.append(pid)
+        pending.extend(children.get(pid, []))
+    return pids
+
+
+def _pss_bytes(pid):
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+
+def monitor(root_pid, interval, rescan):
+    """
+    Body of the monitor process: prints the tree's PSS right away, then samples
+    every `interval` seconds (looking for new descendants every `rescan`
+    seconds) and prints the peak once its stdin is closed.
+    """
+    me = os.getpid()
+    pids, scanned = _descendants(root_pid, me), time.monotonic()
+    before = peak = sum(_pss_bytes(pid) for pid in pids)
+    print(json.dumps({"before": before}), flush=True)
+
+    while not select.select([sys.stdin], [], [], interval)[0]:
+        if time.monotonic() - scanned >= rescan:
+            pids, scanned = _descendants(root_pid, me), time.monotonic()
+        peak = max(peak, sum(_pss_bytes(pid) for pid in pids))
+    pids = _descendants(root_pid, me)
+    peak = max(peak, sum(_pss_bytes(pid) for pid in pids))
+    print(json.dumps({"peak": peak}), flush=True)
+
+
+class PeakMemory:
+    """PSS of this process tree before (`before`) and at its peak during (`peak`) the block, in bytes."""
+
+    def __init__(self, interval=0.05, rescan=0.5):
+        self.interval = interval
+        self.rescan = rescan
+        self.before = self.peak = None
+        self._proc = None
+
+    def __enter__(self):
+        if not os.path.exists(f"/proc/{os.getpid()}/smaps_rollup"):
+            return self
+        self._proc = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), str(os.getpid()), str(self.interval), str(self.rescan)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True,
+        )
+        # Wait for the first sample, so the baseline is taken before the block starts
+        self.before = json.loads(self._proc.stdout.readline())["before"]
+        return self
+
+    def __exit__(self, *exc):
+        if self._proc is None:
+            return
+        self._proc.stdin.close()
+        self.peak = json.loads(self._proc.stdout.readline())["peak"]
+        self._proc.wait()
+
+
+if __name__ == "__main__":
+    monitor(int(sys.argv[1]), float(sys.argv[2]), float(sys.argv[3]))
@@ -0,0 +1,270 @@
+import json
+import math
+import time
+import uuid
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# ============================================================
+# Local stand-in for the OpenAI / DeepSeek / Anthropic APIs
+# ============================================================
+#
+# Answers chat-completion and messages requests with a canned engagement score,
+# after a configurable latency, subject to request/token rate limits and with
+# injected errors, so the sampler scripts and load_test.py can be exercised
+# without spending API credit.
+#
+#   python mock_llm_server.py --port 8000 --latency lognormal:2.0,0.5 --tpm 400000 --error-rate 0.02
+#
+#   OPENAI_BASE_URL=http://localhost:8000/v1 python openai_sample.py --output-dir /tmp/mock/openai
+#   DEEPSEEK_BASE_URL=http://localhost:8000 python deepseek_sample_chat.py --output-dir /tmp/mock/deepseek_chat
+#   ANTHROPIC_BASE_URL=http://localhost:8000 python anthropic_sample_sonnet.py --output-dir /tmp/mock/anthropic_sonnet
+#
+# (The samplers refuse to write mock responses over samples/<model>.)
+#
+# GET /stats returns request counts; POST /reset clears them.
+
+OPENAI_PATHS = {"/v1/chat/completions", "/chat/completions"}
+ANTHROPIC_PATHS = {"/v1/messages", "/messages"}
+
+
+def parse_latency(spec):
+    """
+    Latency sampler from a spec string (seconds):
+    "constant:S", "uniform:LO,HI", "lognormal:MEDIAN,SIGMA" or "exponential:MEAN".
+    """
+    kind, _, values = spec.partition(":")
+    params = [float(v) for v in values.split(",")] if values else []
+    if kind == "constant":
+        return lambda rng: params[0]
+    if kind == "uniform":
+        return lambda rng: rng.uniform(params[0], params[1])
+    if kind == "lognormal":
+        return lambda rng: rng.lognormvariate(math.log(params[0]), params[1])
+    if kind == "exponential":
+        return lambda rng: rng.expovariate(1 / params[0])
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+def estimate_tokens(text):
+    """Rough token count (about four characters per token)."""
+    return max(1, len(text) // 4)
+
+
+class TokenBucket:
+    """Per-minute limit that refills continuously, like the providers' RPM/TPM limits."""
+
+    def __init__(self, per_minute):
+        self.capacity = per_minute
+        self.level = per_minute
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.capacity / 60)
+        self.updated = now
+
+    def wait_time(self, amount):
+        """Seconds until `amount` is available (0 if it is now), without consuming anything."""
+        with self.lock:
+            self._refill()
+            return max(0.0, (amount - self.level) * 60 / self.capacity)
+
+    def take(self, amount):
+        with self.lock:
+            self._refill()
+            self.level -= amount
+
+
+class MockState:
+    def __init__(self, args):
+        self.args = args
+        self.latency = parse_latency(args.latency)
+        self.rpm = TokenBucket(args.rpm) if args.rpm else None
+        self.tpm = TokenBucket(args.tpm) if args.tpm else None
+        # Both limits are checked before either is charged, under one lock
+        self.limit_lock = threading.Lock()
+        self.scores = [int(s) for s in args.scores.split(",")]
+        self.rng = random.Random(args.seed)
+        self.rng_lock = threading.Lock()
+        self.stats_lock = threading.Lock()
+        self.stats = {}
+
+    def draw(self, fn):
+        with self.rng_lock:
+            return fn(self.rng)
+
+    def count(self, key):
+        with self.stats_lock:
+            self.stats[key] = self.stats.get(key, 0) + 1
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    state = None
+
+    def log_message(self, format, *args):
+        if self.state.args.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status, body, headers=None):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_error(self, flavour, status, error_type, message, headers=None):
+        self.state.count(f"error_{status}")
+        if flavour == "anthropic":
+            body = {"type": "error", "error": {"type": error_type, "message": message}}
+        else:
+            body = {"error": {"message": message, "type": error_type, "code": None}}
+        self._send_json(status, body, headers)
+
+    def do_GET(self):
+        if self.path == "/stats":
+            with self.state.stats_lock:
+                self._send_json(200, dict(self.state.stats))
+        else:
+            self._send_json(404, {"error": {"message": "Not found"}})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        raw = self.rfile.read(length)
+
+        if self.path == "/reset":
+            with self.state.stats_lock:
+                self.state.stats.clear()
+            self._send_json(200, {})
+            return
+        if self.path in OPENAI_PATHS:
+            flavour = "openai"
+        elif self.path in ANTHROPIC_PATHS:
+            flavour = "anthropic"
+        else:
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+            return
+
+        self.state.count("requests")
+        request = json.loads(raw or b"{}")
+        prompt = (request.get("system") or "") + "".join(
+            m["content"] if isinstance(m.get("content"), str) else json.dumps(m.get("content"))
+            for m in request.get("messages", [])
+        )
+        args = self.state.args
+        output_text = json.dumps({
+            "score": self.state.draw(lambda rng: rng.choice(self.state.scores)),
+            "reasoning": "Mock response from mock_llm_server.py.",
+        })
+        input_tokens, output_tokens = estimate_tokens(prompt), estimate_tokens(output_text)
+
+        # A request larger than the whole per-minute budget can never succeed; the real APIs reject it with a 400
+        if self.state.tpm is not None and input_tokens + output_tokens > self.state.tpm.capacity:
+            self._send_error(flavour, 400, "invalid_request_error",
+                             f"Request needs {input_tokens + output_tokens} tokens, over the limit of {args.tpm} per minute")
+            return
+
+        # Rate limits are checked on arrival, as the real APIs do; a rejected request uses up neither limit
+        limits = [(bucket, amount, what)
+                  for bucket, amount, what in [(self.state.rpm, 1, "requests"), (self.state.tpm, input_tokens + output_tokens, "tokens")]
+                  if bucket is not None]
+        with self.state.limit_lock:
+            waits = [(bucket.wait_time(amount), what) for bucket, amount, what in limits]
+            wait, what = max(waits, default=(0.0, None))
+            if wait <= 0:
+                for bucket, amount, _ in limits:
+                    bucket.take(amount)
+        if wait > 0:
+            self._send_error(flavour, 429, "rate_limit_error", f"Rate limit on {what} per minute exceeded",
+                             {"retry-after": f"{wait:.3f}"})
+            return
+
+        # Injected failures
+        roll = self.state.draw(lambda rng: rng.random())
+        if roll < args.hang_rate:
+            self.state.count("hangs")
+            time.sleep(args.hang_seconds)
+            self._send_error(flavour, 504, "timeout_error", "Injected hang")
+            return
+        if roll < args.hang_rate + args.error_rate:
+            time.sleep(self.state.draw(self.state.latency) * self.state.draw(lambda rng: rng.random()))
+            status = 529 if flavour == "anthropic" and args.overloaded else 500
+            self._send_error(flavour, status, "api_error", "Injected server error")
+            return
+
+        generation = output_tokens / args.output_tokens_per_second if args.output_tokens_per_second > 0 else 0.0
+        time.sleep(self.state.draw(self.state.latency) + generation)
+        self.state.count("ok")
+
+        model = request.get("model", "mock")
+        if flavour == "anthropic":
+            body = {
+                "id": f"msg_{uuid.uuid4().hex}",
+                "type": "message",
+                "role": "assistant",
+                "model": model,
+                "content": [{"type": "text", "text": output_text}],
+                "stop_reason": "end_turn",
+                "stop_sequence": None,
+                "usage": {"input_tokens": input_tokens, "output_tokens": output_tokens},
+            }
+        else:
+            body = {
+                "id": f"chatcmpl-{uuid.uuid4().hex}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": output_text},
+                    "finish_reason": "stop",
+                }],
+                "usage": {
+                    "prompt_tokens": input_tokens,
+                    "completion_tokens": output_tokens,
+                    "total_tokens": input_tokens + output_tokens,
+                },
+            }
+        self._send_json(200, body)
+
+
+def make_server(args):
+    handler = type("Handler", (MockHandler,), {"state": MockState(args)})
+    return ThreadingHTTPServer((args.host, args.port), handler)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Mock OpenAI/Anthropic-compatible LLM server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", default="lognormal:1.0,0.5",
+                        help='Time to first token: "constant:S", "uniform:LO,HI", "lognormal:MEDIAN,SIGMA", "exponential:MEAN"')
+    parser.add_argument("--output-tokens-per-second", type=float, default=50.0,
+                        help="Generation speed after the first token (0 = no generation time)")
+    parser.add_argument("--rpm", type=int, default=0, help="Requests per minute (0 = unlimited)")
+    parser.add_argument("--tpm", type=int, default=0, help="Input+output tokens per minute (0 = unlimited)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with a 5xx")
+    parser.add_argument("--overloaded", action="store_true", help="Anthropic errors are 529 overloaded instead of 500")
+    parser.add_argument("--hang-rate", type=float, default=0.0, help="Fraction of requests that hang before failing")
+    parser.add_argument("--hang-seconds", type=float, default=60.0)
+    parser.add_argument("--scores", default="2,3,4,4,5", help="Scores to draw the canned response from")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--verbose", action="store_true")
+    return parser
+
+
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+    server = make_server(args)
+    print(f"Mock LLM server on http://{args.host}:{args.port} (latency {args.latency})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -1,65 +1,32 @@
 import os
-import pandas as pd
+import sys
 from openai import OpenAI
+from llm_scoring import SYSTEM_PROMPT, sampler_args, run_sampler
 
-# --- 1. Initialize client ---
-client = OpenAI(api_key='PUT YOUR API HERE') 
-
-# --- 2. Load your dataset ---
-df = pd.read_csv("samples/30_pairs_dissent_1.csv")
-
-# --- 3. Number of repetitions ---
-num_runs = 5
+# --- 0. Options: sample, archive, output directory and optional sharding (see llm_scoring.py) ---
+args = sampler_args("openai", "OPENAI_BASE_URL", "https://api.openai.com/v1")
 
-# --- 4. Outer loop for time index ---
-for run_idx in range(num_runs):
-    output_dir = f"samples/openai/responses_{run_idx}"
-    os.makedirs(output_dir, exist_ok=True)
-    print(f"\n=== Starting run {run_idx}, saving to {output_dir} ===\n")
-
-    # --- 5. Inner loop over each case ---
-    for i, row in df.iterrows():
-        majority_text = row['majority_text']
-        dissent_text = row['dissent_text']
-        official_citation = row['official citation']
-
-        prompt = (
-            "You will be provided with a U.S. Supreme Court opinion, which consists of a majority opinion and a dissenting opinion. "
-            "Your task is to evaluate the extent to which the dissent is 'talking with' the majority opinion or 'talking past' it.\n\n"
-            "Definitions:\n"
-            "Talking with (High Score: 5): The dissent directly engages with the majority’s reasoning, addresses specific legal arguments, "
-            "and attempts to rebut the key points in a way that demonstrates meaningful dialogue.\n"
-            "Talking past (Low Score: 1): The dissent focuses on different issues, ignores key majority reasoning, "
-            "or relies on a separate legal framework with little direct engagement.\n\n"
-            "Scoring Criteria (1–5 Scale):\n"
-            "5 – Strong engagement: The dissent thoroughly addresses the majority’s reasoning, cites the same precedents and statutory interpretations, "
-            "and provides a detailed rebuttal.\n"
-            "4 – Substantial engagement: The dissent engages significantly with the majority’s reasoning, responding to key points, but may also introduce broader concerns.\n"
-            "3 – Moderate engagement: The dissent addresses some of the majority’s arguments but also shifts focus to independent issues or alternative perspectives.\n"
-            "2 – Minimal engagement: The dissent briefly acknowledges the majority’s reasoning but mostly introduces independent legal arguments.\n"
-            "1 – No engagement: The dissent is largely unrelated to the majority opinion, relying on a completely separate framework or ignoring key points.\n\n"
-            f"Majority:\n{majority_text}\n\nDissent:\n{dissent_text}\n\n"
-            "Return only a JSON object with two keys: 'score' (integer from 1 to 5) and 'reasoning' (a short explanation)."
-        )
+# --- 1. Initialize client ---
+# OPENAI_BASE_URL points the client elsewhere, e.g. at mock_llm_server.py
+client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY", 'PUT YOUR API HERE'))
 
-        try:
-            response = client.chat.completions.create(
-                model="gpt-5",
-                messages=[
-                    {"role": "system", "content": "You are an expert legal analyst evaluating Supreme Court opinions."},
-                    {"role": "user", "content": prompt}
-                ]
-            )
 
-            result_text = response.choices[0].message.content.strip()
+# --- 2. One scoring request ---
+def request(prompt):
+    response = client.chat.completions.create(
+        model="gpt-5",
+        messages=[
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ]
+    )
+    return response.choices[0].message.content
 
-            # --- Save each response ---
-            filename = os.path.join(output_dir, f"response_{i}.txt")
-            with open(filename, "w", encoding="utf-8") as f:
-                f.write(f"Official Citation: {row['official citation']}\n\n")
-                f.write(result_text)
 
-            print(f"Saved response to {filename}")
+# --- 3. Score every pair once per run ---
+num_runs = 5
+failed = run_sampler(args, request, num_runs)
 
-        except Exception as e:
-            print(f"Error processing row {i} in run {run_idx}: {e}")
\ No newline at end of file
+# A non-zero exit keeps pipeline.py from recording a partial run as current
+if failed:
+    sys.exit(f"{failed} requests failed; re-run to score them")
@@ -0,0 +1,144 @@
+import os
+import mmap
+import json
+import struct
+import argparse
+import pandas as pd
+import zstandard as zstd
+from tqdm import tqdm
+
+# ============================================================
+# Compressed, random-access archive of opinion texts
+# ============================================================
+#
+# One file holding every opinion as its own zstd frame, keyed by `case_key` and
+# opinion label ("majority", "dissent1", ... as in document_mapping.csv).
+# Majority texts repeated across a case's dissents are stored once.
+#
+# Layout:
+#   header  MAGIC | index offset (u64) | index length (u64)
+#   frames  one zstd frame per opinion, back to back
+#   index   zstd-compressed JSON {"<case_key>/<label>": [offset, length, text bytes]}
+#
+# Readers mmap the file, so looking up an opinion is a dict lookup plus a slice
+# of the mapping; only the requested frames are ever read from disk.
+#
+#   python opinion_archive.py build results_filtered/pair_metadata.csv
+#   python opinion_archive.py get a3310 dissent1
+
+ARCHIVE_PATH = "results_filtered/opinion_texts.zarc"
+MAGIC = b"OPINARC1"
+HEADER = struct.Struct("<8sQQ")
+
+
+def _key(case_key, opinion_label):
+    return f"{case_key}/{opinion_label}"
+
+
+def build_archive(pair_csv, archive_path=ARCHIVE_PATH, level=10, chunksize=500):
+    """Stream a pair table (case_key, dissent_ind, majority_text, dissent_text) into an archive."""
+    compressor = zstd.ZstdCompressor(level=level)
+    index = {}
+    tmp_path = archive_path + ".tmp"
+    os.makedirs(os.path.dirname(archive_path) or ".", exist_ok=True)
+
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, 0, 0))
+
+        def add(case_key, opinion_label, text):
+            data = ("" if pd.isna(text) else text).encode("utf-8")
+            frame = compressor.compress(data)
+            index[_key(case_key, opinion_label)] = [f.tell(), len(frame), len(data)]
+            f.write(frame)
+
+        # Read in chunks so a multi-GB pair table never has to fit in memory
+        chunks = pd.read_csv(
+            pair_csv, usecols=["case_key", "dissent_ind", "majority_text", "dissent_text"], chunksize=chunksize
+        )
+        for chunk in tqdm(chunks, desc="Compressing opinions"):
+            for row in chunk.itertuples(index=False):
+                if _key(row.case_key, "majority") not in index:
+                    add(row.case_key, "majority", row.majority_text)
+                add(row.case_key, f"dissent{row.dissent_ind}", row.dissent_text)
+
+        index_offset = f.tell()
+        index_frame = compressor.compress(json.dumps(index).encode("utf-8"))
+        f.write(index_frame)
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, index_offset, len(index_frame)))
+
+    os.replace(tmp_path, archive_path)
+    print(f"{archive_path} saved with {len(index)} opinions ({os.path.getsize(archive_path) / 1e6:.1f} MB)")
+
+
+class OpinionArchive:
+    """Read-only, memory-mapped view of an archive written by build_archive()."""
+
+    def __init__(self, archive_path=ARCHIVE_PATH):
+        self._file = open(archive_path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+        magic, index_offset, index_length = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{archive_path} is not an opinion archive")
+        self._decompressor = zstd.ZstdDecompressor()
+        self._index = json.loads(
+            self._decompressor.decompress(self._view[index_offset:index_offset + index_length])
+        )
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, key):
+        return _key(*key) in self._index
+
+    def keys(self):
+        """(case_key, opinion_label) of every stored opinion."""
+        return [tuple(k.split("/", 1)) for k in self._index]
+
+    def frame(self, case_key, opinion_label):
+        """
+        The compressed frame of one opinion, as a zero-copy view into the mapped
+        file. Release the view before closing the archive.
+        """
+        offset, length, _ = self._index[_key(case_key, opinion_label)]
+        return self._view[offset:offset + length]
+
+    def get_bytes(self, case_key, opinion_label):
+        """UTF-8 bytes of one opinion."""
+        _, _, size = self._index[_key(case_key, opinion_label)]
+        return self._decompressor.decompress(self.frame(case_key, opinion_label), max_output_size=size)
+
+    def get(self, case_key, opinion_label):
+        """Text of one opinion; raises KeyError if it is not in the archive."""
+        return self.get_bytes(case_key, opinion_label).decode("utf-8")
+
+    def close(self):
+        self._view.release()
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or query the compressed opinion text archive.")
+    parser.add_argument("--archive", default=ARCHIVE_PATH)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build_parser = subparsers.add_parser("build", help="Build the archive from a pair table CSV")
+    build_parser.add_argument("pair_csv", nargs="?", default="results_filtered/pair_metadata.csv")
+    build_parser.add_argument("--level", type=int, default=10, help="zstd compression level")
+    get_parser = subparsers.add_parser("get", help="Print one opinion")
+    get_parser.add_argument("case_key")
+    get_parser.add_argument("opinion_label", help='"majority" or "dissent<dissent_ind>"')
+    args = parser.parse_args()
+
+    if args.command == "build":
+        build_archive(args.pair_csv, args.archive, level=args.level)
+    else:
+        with OpinionArchive(args.archive) as archive:
+            print(archive.get(args.case_key, args.opinion_label))
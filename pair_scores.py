@@ -0,0 +1,39 @@
+import argparse
+import pandas as pd
+
+# Attach the topic-model KL divergence, Doc2Vec cosine similarity and TF-IDF/BM25
+# similarity of each majority–dissent pair to the pair metadata (optionally the
+# SCDB-merged pair_metadata_with_scdb.csv, via --pair-metadata).
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--num-components", type=int, default=110,
+                    help="Which topic_model_<n> run to take kldiv_score from")
+parser.add_argument("--pair-metadata", default="results_filtered/pair_metadata.csv")
+args = parser.parse_args()
+
+pair_metadata_df = pd.read_csv(args.pair_metadata)
+kl_divergence_df = pd.read_csv(f"results_filtered/topic_model_{args.num_components}/kl_divergence_metadata.csv")
+cosine_similarity_df = pd.read_csv("results_filtered/doc2vec/cosine_similarity_metadata.csv")
+tfidf_similarity_df = pd.read_csv("results_filtered/tfidf/tfidf_similarity_metadata.csv")
+bm25_similarity_df = pd.read_csv("results_filtered/tfidf/bm25_similarity_metadata.csv")
+
+# Score files label dissents as "dissent<dissent_ind>"
+pair_metadata_df["dissent_opinion_label"] = "dissent" + pair_metadata_df["dissent_ind"].astype(str)
+merge_keys = ["case_key", "dissent_opinion_label"]
+
+kl_divergence_df = kl_divergence_df[merge_keys + ["kl_divergence"]].rename(columns={"kl_divergence": "kldiv_score"})
+cosine_similarity_df = cosine_similarity_df[merge_keys + ["cosine_similarity"]].rename(columns={"cosine_similarity": "cossim_score"})
+tfidf_similarity_df = tfidf_similarity_df[merge_keys + ["tfidf_similarity"]].rename(columns={"tfidf_similarity": "tfidf_score"})
+bm25_similarity_df = bm25_similarity_df[merge_keys + ["bm25_similarity"]].rename(columns={"bm25_similarity": "bm25_score"})
+
+pair_metadata_df = (
+    pair_metadata_df
+    .merge(kl_divergence_df, on=merge_keys, how="left")
+    .merge(cosine_similarity_df, on=merge_keys, how="left")
+    .merge(tfidf_similarity_df, on=merge_keys, how="left")
+    .merge(bm25_similarity_df, on=merge_keys, how="left")
+    .drop(columns="dissent_opinion_label")
+)
+
+pair_metadata_df.to_csv("results_filtered/pair_metadata_w_scores.csv", index=False)
+print("pair_metadata_w_scores.csv saved with shape:", pair_metadata_df.shape)
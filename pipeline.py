@@ -0,0 +1,383 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+# ============================================================
+# DAG runner for the replication pipeline
+# ============================================================
+#
+# Each stage declares the script it runs, the files/directories it reads and
+# writes, and its parameters as command-line arguments. A stage is skipped when
+# the fingerprint of its script, arguments and input contents matches the one
+# recorded after its last successful run, and its outputs are still exactly what
+# that run produced. Stages whose inputs are ready run concurrently.
+#
+#   python pipeline.py                   # bring the default stages up to date
+#   python pipeline.py doc2vec --dry-run # what would run to refresh doc2vec
+#   python pipeline.py --list
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+STATE_DIR = os.path.join(ROOT, ".pipeline")
+HASH_CACHE_PATH = os.path.join(STATE_DIR, "hashes.json")
+
+# Notebook checkpoints are editor artifacts, not pipeline data
+IGNORED_NAMES = {".ipynb_checkpoints", "__pycache__"}
+
+TOPIC_COMPONENTS = [90, 95, 105, 110]
+KL_COMPONENTS = 110
+LLM_MODELS = {
+    "openai": "openai_sample.py",
+    "deepseek_chat": "deepseek_sample_chat.py",
+    "deepseek_reasoner": "deepseek_sample_reasoner.py",
+    "anthropic_sonnet": "anthropic_sample_sonnet.py",
+    "anthropic_opus": "anthropic_sample_opus.py",
+}
+LLM_SAMPLE = "samples/30_pairs_dissent_1.csv"
+
+
+def stage(name, script, inputs=(), outputs=(), args=(), default=True):
+    # Stages with default=False (optional data, paid API calls) only run when named as targets
+    return {
+        "name": name,
+        "script": script,
+        "args": [str(a) for a in args],
+        "inputs": list(inputs),
+        "outputs": list(outputs),
+        "default": default,
+    }
+
+
+STAGES = [
+    stage("download", "data_download_replication.py",
+          args=["--steps", "download"],
+          outputs=["data/zip"]),
+    # Ingesting the CAP JSON and building pairs share the in-memory case list,
+    # so they are one stage.
+    stage("pairs", "data_download_replication.py",
+          args=["--steps", "pairs"],
+          inputs=["data/zip"],
+          outputs=["results/majority_length.csv", "results_filtered/pair_metadata.csv"]),
+    # Optional: the SCDB merge is a template that needs a citation column derived from CAP
+    stage("scdb", "data_download_replication.py",
+          args=["--steps", "scdb"],
+          inputs=["results_filtered/pair_metadata.csv", "data/SCDB_2024_01_caseCentered_Citation.csv"],
+          outputs=["results_filtered/pair_metadata_with_scdb.csv"],
+          default=False),
+    # The samplers only read the sampled pairs, so their archive is built from the
+    # sample; changes elsewhere in the pair table do not re-run paid scoring
+    stage("archive", "opinion_archive.py",
+          args=["build", LLM_SAMPLE],
+          inputs=[LLM_SAMPLE],
+          outputs=["results_filtered/opinion_texts.zarc"],
+          default=False),
+    stage("preprocess", "preprocess_filtered.py",
+          inputs=["results_filtered/pair_metadata.csv"],
+          outputs=["results_filtered/pair_tokens.pkl"]),
+    stage("topic_model", "topic_model_filtered.py",
+          args=["--num-components", *TOPIC_COMPONENTS],
+          inputs=["results_filtered/pair_tokens.pkl", "topic_utils.py", "topic_backends.py", "memory_monitor.py"],
+          outputs=[f"results_filtered/topic_model_{n}" for n in TOPIC_COMPONENTS]),
+    stage("doc2vec", "doc2vec_filtered.py",
+          inputs=["results_filtered/pair_tokens.pkl"],
+          outputs=["results_filtered/doc2vec"]),
+    stage("tfidf", "tfidf_filtered.py",
+          inputs=["results_filtered/pair_tokens.pkl"],
+          outputs=["results_filtered/tfidf"]),
+    stage("pair_scores", "pair_scores.py",
+          args=["--num-components", KL_COMPONENTS],
+          inputs=["results_filtered/pair_metadata.csv",
+                  f"results_filtered/topic_model_{KL_COMPONENTS}/kl_divergence_metadata.csv",
+                  "results_filtered/doc2vec/cosine_similarity_metadata.csv",
+                  "results_filtered/tfidf/tfidf_similarity_metadata.csv",
+                  "results_filtered/tfidf/bm25_similarity_metadata.csv"],
+          outputs=["results_filtered/pair_metadata_w_scores.csv"]),
+    *[stage(f"llm_{model}", script,
+            inputs=[LLM_SAMPLE, "results_filtered/opinion_texts.zarc", "llm_scoring.py", "shard_utils.py", "opinion_archive.py"],
+            outputs=[f"samples/{model}"],
+            default=False)
+      for model, script in LLM_MODELS.items()],
+    stage("aggregate", "aggregate_scores.py",
+          inputs=[LLM_SAMPLE, *[f"samples/{model}" for model in LLM_MODELS]],
+          outputs=["samples/30_pairs_w_llm_scores.csv"],
+          default=False),
+]
+STAGES_BY_NAME = {s["name"]: s for s in STAGES}
+
+
+# ------------------------------------------------------------
+# Dependency graph
+# ------------------------------------------------------------
+
+def _covers(output, path):
+    """True if `path` is `output` or lives inside the `output` directory."""
+    return path == output or path.startswith(output.rstrip("/") + "/")
+
+
+def upstream_of(s):
+    """Names of the stages producing any of the inputs of stage `s`."""
+    return sorted({
+        other["name"]
+        for other in STAGES
+        if other is not s
+        and any(_covers(out, inp) for inp in s["inputs"] for out in other["outputs"])
+    })
+
+
+def select_stages(targets):
+    """`targets` plus everything they transitively depend on, in declaration order."""
+    selected = set()
+    pending = list(targets)
+    while pending:
+        name = pending.pop()
+        if name not in selected:
+            selected.add(name)
+            pending.extend(upstream_of(STAGES_BY_NAME[name]))
+    return [s for s in STAGES if s["name"] in selected]
+
+
+# ------------------------------------------------------------
+# Content hashing
+# ------------------------------------------------------------
+
+_hash_cache = {}
+_hash_lock = threading.Lock()
+
+
+def _load_hash_cache():
+    if os.path.exists(HASH_CACHE_PATH):
+        with open(HASH_CACHE_PATH) as f:
+            _hash_cache.update(json.load(f))
+
+
+def _save_hash_cache():
+    os.makedirs(STATE_DIR, exist_ok=True)
+    with _hash_lock:
+        snapshot = dict(_hash_cache)
+    with open(HASH_CACHE_PATH + ".tmp", "w") as f:
+        json.dump(snapshot, f)
+    os.replace(HASH_CACHE_PATH + ".tmp", HASH_CACHE_PATH)
+
+
+def file_digest(path):
+    """sha256 of a file, memoized on (size, mtime) so unchanged files are not re-read."""
+    st = os.stat(path)
+    key = os.path.relpath(path, ROOT)
+    with _hash_lock:
+        cached = _hash_cache.get(key)
+    if cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+        return cached[2]
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    digest = h.hexdigest()
+    with _hash_lock:
+        _hash_cache[key] = [st.st_size, st.st_mtime_ns, digest]
+    return digest
+
+
+def path_digest(rel_path):
+    """Digest of a file, or of every file (by relative name) under a directory; None if missing."""
+    path = os.path.join(ROOT, rel_path)
+    if os.path.isfile(path):
+        return file_digest(path)
+    if not os.path.isdir(path):
+        return None
+    h = hashlib.sha256()
+    for dirpath, dirnames, filenames in os.walk(path):
+        dirnames[:] = sorted(d for d in dirnames if d not in IGNORED_NAMES)
+        for fname in sorted(filenames):
+            fpath = os.path.join(dirpath, fname)
+            h.update(os.path.relpath(fpath, path).encode())
+            h.update(file_digest(fpath).encode())
+    return h.hexdigest()
+
+
+def fingerprint(s):
+    """Fingerprint of everything that determines a stage's outputs; None if an input is missing."""
+    h = hashlib.sha256()
+    h.update(json.dumps([s["script"], s["args"]]).encode())
+    for rel_path in [s["script"], *s["inputs"]]:
+        digest = path_digest(rel_path)
+        if digest is None:
+            return None
+        h.update(rel_path.encode())
+        h.update(digest.encode())
+    return h.hexdigest()
+
+
+# ------------------------------------------------------------
+# Stage state
+# ------------------------------------------------------------
+
+def _state_path(s):
+    return os.path.join(STATE_DIR, f"{s['name']}.json")
+
+
+def load_state(s):
+    if not os.path.exists(_state_path(s)):
+        return None
+    with open(_state_path(s)) as f:
+        return json.load(f)
+
+
+def save_state(s, stage_fingerprint):
+    os.makedirs(STATE_DIR, exist_ok=True)
+    state = {
+        "fingerprint": stage_fingerprint,
+        "outputs": {out: path_digest(out) for out in s["outputs"]},
+        "recorded_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    with open(_state_path(s), "w") as f:
+        json.dump(state, f, indent=2)
+
+
+def is_current(s, stage_fingerprint):
+    state = load_state(s)
+    if state is None or state["fingerprint"] != stage_fingerprint:
+        return False
+    return all(
+        path_digest(out) is not None and path_digest(out) == state["outputs"].get(out)
+        for out in s["outputs"]
+    )
+
+
+# ------------------------------------------------------------
+# Execution
+# ------------------------------------------------------------
+
+def run_stage(s, force=False):
+    """Run one stage if it is stale. Returns "skipped" or "ran"; raises on failure."""
+    stage_fingerprint = fingerprint(s)
+    if stage_fingerprint is None:
+        missing = [p for p in [s["script"], *s["inputs"]] if path_digest(p) is None]
+        raise RuntimeError(f"missing inputs: {', '.join(missing)}")
+    if not force and is_current(s, stage_fingerprint):
+        return "skipped"
+
+    os.makedirs(os.path.join(STATE_DIR, "logs"), exist_ok=True)
+    log_path = os.path.join(STATE_DIR, "logs", f"{s['name']}.log")
+    with open(log_path, "w") as log:
+        result = subprocess.run(
+            [sys.executable, s["script"], *s["args"]],
+            cwd=ROOT, stdout=log, stderr=subprocess.STDOUT,
+        )
+    if result.returncode != 0:
+        raise RuntimeError(f"exit code {result.returncode}, see {os.path.relpath(log_path, ROOT)}")
+    missing = [out for out in s["outputs"] if path_digest(out) is None]
+    if missing:
+        raise RuntimeError(f"did not produce: {', '.join(missing)}")
+    save_state(s, stage_fingerprint)
+    return "ran"
+
+
+def run(stages, jobs, force=()):
+    """Run `stages` in dependency order, `jobs` at a time. Returns the names of failed stages."""
+    names = {s["name"] for s in stages}
+    deps = {s["name"]: set(upstream_of(s)) & names for s in stages}
+    done, failed, blocked = set(), set(), set()
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        while True:
+            for s in stages:
+                name = s["name"]
+                if name in done or name in failed or name in blocked or name in running.values():
+                    continue
+                if deps[name] & (failed | blocked):
+                    blocked.add(name)
+                    print(f"[blocked] {name}")
+                elif deps[name] <= done:
+                    print(f"[start] {name}")
+                    running[pool.submit(run_stage, s, name in force)] = name
+            if not running:
+                break
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                try:
+                    status = future.result()
+                except Exception as e:
+                    failed.add(name)
+                    print(f"[failed] {name}: {e}")
+                else:
+                    done.add(name)
+                    print(f"[{status}] {name}")
+            _save_hash_cache()
+
+    return failed | blocked
+
+
+def dry_run(stages, force=()):
+    """Report which stages would run, without running anything."""
+    stale = set()
+    for s in stages:
+        name = s["name"]
+        if name in force:
+            reason = "forced"
+        elif set(upstream_of(s)) & stale:
+            reason = "upstream stale"
+        else:
+            stage_fingerprint = fingerprint(s)
+            if stage_fingerprint is None:
+                reason = "missing inputs"
+            elif is_current(s, stage_fingerprint):
+                print(f"[current] {name}")
+                continue
+            else:
+                reason = "stale"
+        stale.add(name)
+        print(f"[stale] {name} ({reason})")
+    _save_hash_cache()
+
+
+def adopt(stages):
+    """Record existing outputs as current, e.g. results produced before the runner existed."""
+    for s in stages:
+        stage_fingerprint = fingerprint(s)
+        if stage_fingerprint is None or any(path_digest(out) is None for out in s["outputs"]):
+            print(f"[skipped] {s['name']} (inputs or outputs missing)")
+            continue
+        save_state(s, stage_fingerprint)
+        print(f"[adopted] {s['name']}")
+    _save_hash_cache()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the pipeline, skipping stages whose outputs are current.")
+    parser.add_argument("targets", nargs="*", help="Stages to bring up to date (default: all but SCDB and LLM scoring)")
+    parser.add_argument("--jobs", "-j", type=int, default=4, help="Stages to run concurrently")
+    parser.add_argument("--force", action="store_true", help="Re-run the targets even if current")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would run")
+    parser.add_argument("--adopt", action="store_true",
+                        help="Mark existing outputs of the selected stages as current without running them")
+    parser.add_argument("--list", action="store_true", help="List stages and their dependencies")
+    args = parser.parse_args()
+
+    unknown = sorted(set(args.targets) - set(STAGES_BY_NAME))
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(unknown)} (see --list)")
+
+    _load_hash_cache()
+    targets = args.targets or [s["name"] for s in STAGES if s["default"]]
+    stages = select_stages(targets)
+    force = set(targets) if args.force else set()
+
+    if args.list:
+        for s in STAGES:
+            optional = "" if s["default"] else "  (only when named)"
+            print(f"{s['name']:<24} <- {', '.join(upstream_of(s)) or '-'}{optional}")
+    elif args.dry_run:
+        dry_run(stages, force)
+    elif args.adopt:
+        adopt([s for s in stages if s["name"] in targets])
+    else:
+        failed = run(stages, args.jobs, force)
+        sys.exit(1 if failed else 0)
@@ -0,0 +1,63 @@
+import os
+import re
+import nltk
+import pandas as pd
+from nltk.tokenize import word_tokenize
+from tqdm import tqdm
+
+# Tokenize every opinion in pair_metadata.csv once and share the tokens
+# between the topic model, Doc2Vec and other downstream scorers.
+#
+# The topic model has always tokenized the lowercased text, while Doc2Vec
+# lowercases after tokenizing; Punkt splits the two differently, so both token
+# lists are kept to reproduce each model's published scores.
+
+output_path = "results_filtered/pair_tokens.pkl"
+
+nltk.download('punkt')
+
+
+def preprocess_text(text):
+
+    # Tokenize text into words
+    all_words = [word.lower() for word in word_tokenize(text)]
+
+    # Filter out words containing non-alphabetic characters
+    word_tokens = [word for word in all_words if word.isalpha()]
+
+    return word_tokens
+
+
+def preprocess_topic_text(text):
+
+    # Tokenize the lowercased text, keeping purely alphabetic words
+    # (stop words and lemmatization are applied in topic_utils.py)
+    tokens = word_tokenize(text.lower())
+    return [word for word in tokens if re.fullmatch(r"[a-zA-Z]+", word)]
+
+
+# Load `pair_metadata.csv` (Filtered cases with majority length > 50)
+pair_metadata_df = pd.read_csv(
+    "results_filtered/pair_metadata.csv",
+    usecols=["case_key", "dissent_ind", "majority_text", "dissent_text"],
+)
+
+# Majority opinions repeat once per dissent, so tokenize each distinct text once
+majority_tokens, majority_topic_tokens = {}, {}
+for text in tqdm(pair_metadata_df["majority_text"].unique(), desc="Tokenizing majority opinions"):
+    majority_tokens[text] = preprocess_text(text)
+    majority_topic_tokens[text] = preprocess_topic_text(text)
+
+tqdm.pandas(desc="Tokenizing dissent opinions")
+pair_tokens_df = pd.DataFrame({
+    "case_key": pair_metadata_df["case_key"],
+    "dissent_ind": pair_metadata_df["dissent_ind"],
+    "majority_tokens": pair_metadata_df["majority_text"].map(majority_tokens),
+    "dissent_tokens": pair_metadata_df["dissent_text"].progress_apply(preprocess_text),
+    "majority_topic_tokens": pair_metadata_df["majority_text"].map(majority_topic_tokens),
+    "dissent_topic_tokens": pair_metadata_df["dissent_text"].progress_apply(preprocess_topic_text),
+})
+
+os.makedirs(os.path.dirname(output_path), exist_ok=True)
+pair_tokens_df.to_pickle(output_path)
+print("pair_tokens.pkl saved with shape:", pair_tokens_df.shape)
@@ -0,0 +1,39 @@
+import os
+import hashlib
+
+# Shard assignment and shard output paths, shared by sharding.py and the LLM
+# samplers (via llm_scoring.py). Kept apart from the score workers so the paid
+# llm_* pipeline stages only fingerprint what the samplers actually run.
+
+SHARD_ROOT = "shards"
+
+
+def shard_of(case_key, num_shards):
+    """Stable shard index of a case (Python's hash() is salted per process)."""
+    digest = hashlib.md5(str(case_key).encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % num_shards
+
+
+def select_shard(df, shard, num_shards):
+    """Rows of `df` belonging to `shard`, keeping the original (global) index."""
+    if num_shards == 1:
+        return df
+    mask = df["case_key"].map(lambda key: shard_of(key, num_shards)) == shard
+    return df[mask]
+
+
+def shard_dir(base_dir, shard, num_shards):
+    """Where a shard worker writes the outputs destined for `base_dir`, always under SHARD_ROOT."""
+    base_dir = os.path.normpath(base_dir)
+    if os.path.isabs(base_dir) or base_dir.split(os.sep)[0] == os.pardir:
+        # Mirror absolute (or outside-the-repo) directories below SHARD_ROOT without their anchor
+        drive, base_dir = os.path.splitdrive(os.path.abspath(base_dir))
+        base_dir = base_dir.lstrip(os.sep)
+    return os.path.join(SHARD_ROOT, base_dir, f"{shard}-of-{num_shards}")
+
+
+def sampler_dir(base_dir, shard, num_shards):
+    """Where an LLM sampler writes its responses; `base_dir` itself when not sharding."""
+    if num_shards == 1:
+        return base_dir
+    return shard_dir(base_dir, shard, num_shards)
@@ -0,0 +1,239 @@
+import os
+import sys
+import glob
+import shutil
+import pickle
+import argparse
+import subprocess
+import numpy as np
+import pandas as pd
+from shard_utils import select_shard, shard_dir, sampler_dir
+
+# ============================================================
+# Sharded pair scoring with a deterministic merge
+# ============================================================
+#
+# Pairs are assigned to one of N shards by a stable hash of `case_key` (see
+# shard_utils.py), so every
+# dissent of a case lands on the same shard regardless of machine or process.
+# Each worker scores only its shard and writes its outputs, tagged with the
+# global pair index, under `shards/<output dir>/<i>-of-<N>/` (outside the output
+# directory, so pipeline.py only sees the merged files). The merge step puts the
+# rows back into global order and rebuilds the single-node files byte for byte.
+#
+#   python sharding.py worker kl --shard 0 --num-shards 4 --num-components 110
+#   python sharding.py merge kl --num-shards 4 --num-components 110
+#   python sharding.py local openai --num-shards 4   # N local processes + merge
+#
+# Tasks:
+#   kl      - topic inference + KL divergence (needs topic_model.pkl from topic_model_filtered.py)
+#   cosine  - Doc2Vec cosine similarity (needs document_embeddings.npy from doc2vec_filtered.py)
+#   <model> - LLM scoring with the model's sampler script (openai, deepseek_chat, ...)
+
+PAIR_TOKENS = "results_filtered/pair_tokens.pkl"
+# Single-node output files of each score task: (metadata CSV, values .npy)
+SCORE_FILES = {
+    "kl": ("kl_divergence_metadata.csv", "kl_divergences.npy"),
+    "cosine": ("cosine_similarity_metadata.csv", "cosine_similarities.npy"),
+}
+LLM_SAMPLERS = {
+    "openai": "openai_sample.py",
+    "deepseek_chat": "deepseek_sample_chat.py",
+    "deepseek_reasoner": "deepseek_sample_reasoner.py",
+    "anthropic_sonnet": "anthropic_sample_sonnet.py",
+    "anthropic_opus": "anthropic_sample_opus.py",
+}
+
+
+# ------------------------------------------------------------
+# 1. Shard outputs and merge
+# ------------------------------------------------------------
+
+def save_shard_scores(out_dir, task, pair_index, metadata, columns, values):
+    """
+    Write one shard's metadata CSV (with a leading pair_index column) and
+    values .npy under the task's single-node file names, plus `pair_index.npy`.
+    """
+    metadata_file, values_file = SCORE_FILES[task]
+    os.makedirs(out_dir, exist_ok=True)
+    metadata_df = pd.DataFrame(metadata, columns=columns)
+    metadata_df.insert(0, "pair_index", pair_index)
+    metadata_df.to_csv(os.path.join(out_dir, metadata_file), index=False)
+    np.save(os.path.join(out_dir, values_file), values)
+    np.save(os.path.join(out_dir, "pair_index.npy"), np.asarray(pair_index, dtype=np.int64))
+
+
+def merge_shard_scores(base_dir, task, num_shards):
+    """
+    Rebuild the task's metadata CSV and values .npy in `base_dir` from the shard
+    outputs. The CSV rows are merged as text so float formatting is untouched.
+    """
+    metadata_file, values_file = SCORE_FILES[task]
+    header = None
+    rows = []
+    values, indices = [], []
+    for shard in range(num_shards):
+        out_dir = shard_dir(base_dir, shard, num_shards)
+        with open(os.path.join(out_dir, metadata_file), encoding="utf-8", newline="") as f:
+            lines = f.read().splitlines(keepends=True)
+        shard_header = lines[0].split(",", 1)[1]
+        if header is not None and shard_header != header:
+            raise ValueError(f"Shard {shard} has a different header: {shard_header!r}")
+        header = shard_header
+        for line in lines[1:]:
+            pair_index, row = line.split(",", 1)
+            rows.append((int(pair_index), row))
+        values.append(np.load(os.path.join(out_dir, values_file)))
+        indices.append(np.load(os.path.join(out_dir, "pair_index.npy")))
+
+    rows.sort(key=lambda r: r[0])
+    pair_index = np.concatenate(indices)
+    if len(set(pair_index.tolist())) != len(pair_index):
+        raise ValueError("The same pair was scored by more than one shard")
+    order = np.argsort(pair_index, kind="stable")
+
+    with open(os.path.join(base_dir, metadata_file), "w", encoding="utf-8", newline="") as f:
+        f.write(header)
+        f.writelines(row for _, row in rows)
+    # Empty shards save a float64 placeholder; leave them out so the dtype matches a single-node run
+    values = [v for v in values if len(v)] or values
+    np.save(os.path.join(base_dir, values_file), np.concatenate(values)[order])
+    print(f"Merged {num_shards} shards into {os.path.join(base_dir, metadata_file)} ({len(rows)} pairs)")
+
+
+def merge_responses(base_dir, num_shards):
+    """Copy every shard's responses_<run>/response_<i>.txt into base_dir/responses_<run>/."""
+    copied = 0
+    for shard in range(num_shards):
+        out_dir = sampler_dir(base_dir, shard, num_shards)
+        if out_dir == base_dir:
+            continue
+        for src in sorted(glob.glob(os.path.join(out_dir, "responses_*", "response_*.txt"))):
+            run_dir = os.path.basename(os.path.dirname(src))
+            dst_dir = os.path.join(base_dir, run_dir)
+            os.makedirs(dst_dir, exist_ok=True)
+            shutil.copyfile(src, os.path.join(dst_dir, os.path.basename(src)))
+            copied += 1
+    print(f"Merged {copied} responses from {num_shards} shards into {base_dir}")
+
+
+# ------------------------------------------------------------
+# 2. Workers
+# ------------------------------------------------------------
+
+def kl_worker(shard, num_shards, num_components, backend="lda"):
+    """Topic inference and KL divergence for one shard, as in topic_model_filtered.py."""
+    from topic_utils import preprocess_text, compute_kl_divergence
+
+    from topic_backends import ROW_INDEPENDENT_BACKENDS, topic_model_dir
+
+    base_dir = topic_model_dir(backend, num_components)
+    with open(os.path.join(base_dir, "topic_model.pkl"), "rb") as f:
+        model = pickle.load(f)
+
+    pair_tokens_df = select_shard(pd.read_pickle(PAIR_TOKENS), shard, num_shards)
+    kl_divergences, kl_metadata = [], []
+    if model["backend"] in ROW_INDEPENDENT_BACKENDS:
+        corpus = []
+        for _, row in pair_tokens_df.iterrows():
+            corpus.append(preprocess_text(row["majority_topic_tokens"]))
+            corpus.append(preprocess_text(row["dissent_topic_tokens"]))
+        if corpus:
+            topic_distributions = model["model"].transform(model["vectorizer"].transform(corpus))
+    else:
+        # Inference is not per-document for this backend; score the fitted distributions instead
+        all_distributions = np.load(os.path.join(base_dir, "topic_distributions.npy"), mmap_mode="r")
+        doc_rows = np.column_stack([2 * pair_tokens_df.index, 2 * pair_tokens_df.index + 1]).ravel()
+        topic_distributions = np.asarray(all_distributions[doc_rows])
+    for k, (_, row) in enumerate(pair_tokens_df.iterrows()):
+        kl_div_value = compute_kl_divergence(topic_distributions[2 * k], topic_distributions[2 * k + 1])
+        kl_divergences.append(kl_div_value)
+        kl_metadata.append((row["case_key"], "majority", f"dissent{row['dissent_ind']}", kl_div_value))
+
+    save_shard_scores(
+        shard_dir(base_dir, shard, num_shards), "kl", pair_tokens_df.index.tolist(), kl_metadata,
+        ["case_key", "majority_opinion_label", "dissent_opinion_label", "kl_divergence"],
+        np.array(kl_divergences),
+    )
+
+
+def cosine_worker(shard, num_shards):
+    """Cosine similarity of the trained Doc2Vec vectors for one shard, as in doc2vec_filtered.py."""
+    from sklearn.metrics.pairwise import cosine_similarity
+
+    base_dir = "results_filtered/doc2vec"
+    document_vectors = np.load(os.path.join(base_dir, "document_embeddings.npy"), mmap_mode="r")
+
+    pair_tokens_df = select_shard(
+        pd.read_pickle(PAIR_TOKENS)[["case_key", "dissent_ind"]], shard, num_shards
+    )
+    cosine_similarities, cosine_metadata = [], []
+    for pair_index, row in pair_tokens_df.iterrows():
+        majority_vector = np.asarray(document_vectors[2 * pair_index]).reshape(1, -1)
+        dissent_vector = np.asarray(document_vectors[2 * pair_index + 1]).reshape(1, -1)
+        cos_sim_value = cosine_similarity(majority_vector, dissent_vector)[0, 0]
+        cosine_similarities.append(cos_sim_value)
+        cosine_metadata.append((row["case_key"], "majority", f"dissent{row['dissent_ind']}", cos_sim_value))
+
+    save_shard_scores(
+        shard_dir(base_dir, shard, num_shards), "cosine", pair_tokens_df.index.tolist(), cosine_metadata,
+        ["case_key", "majority_opinion_label", "dissent_opinion_label", "cosine_similarity"],
+        np.array(cosine_similarities),
+    )
+
+
+def llm_output_dir(args):
+    """Output directory of an LLM task; the sampler's own default unless --output-dir is given."""
+    return args.output_dir or f"samples/{args.task}"
+
+
+def worker_command(args, shard):
+    if args.task in LLM_SAMPLERS:
+        return [sys.executable, LLM_SAMPLERS[args.task], "--shard", str(shard), "--num-shards", str(args.num_shards),
+                "--output-dir", llm_output_dir(args)]
+    return [sys.executable, os.path.abspath(__file__), "worker", args.task, "--shard", str(shard),
+            "--num-shards", str(args.num_shards), "--num-components", str(args.num_components), "--backend", args.backend]
+
+
+def merge(args):
+    if args.task == "kl":
+        from topic_backends import topic_model_dir
+        merge_shard_scores(topic_model_dir(args.backend, args.num_components), "kl", args.num_shards)
+    elif args.task == "cosine":
+        merge_shard_scores("results_filtered/doc2vec", "cosine", args.num_shards)
+    else:
+        merge_responses(llm_output_dir(args), args.num_shards)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sharded pair scoring with a deterministic merge.")
+    parser.add_argument("action", choices=["worker", "merge", "local"])
+    parser.add_argument("task", choices=["kl", "cosine", *LLM_SAMPLERS])
+    parser.add_argument("--shard", type=int, default=0)
+    parser.add_argument("--num-shards", type=int, required=True)
+    parser.add_argument("--num-components", type=int, default=110, help="Which topic_model_<n> to score (kl)")
+    parser.add_argument("--backend", default="lda", help="Topic backend of the run to score (kl)")
+    parser.add_argument("--output-dir", help="Responses directory of an LLM task (default: samples/<task>)")
+    args = parser.parse_args()
+
+    if args.action == "worker":
+        if not 0 <= args.shard < args.num_shards:
+            parser.error("--shard must be in [0, --num-shards)")
+        if args.task == "kl":
+            kl_worker(args.shard, args.num_shards, args.num_components, args.backend)
+        elif args.task == "cosine":
+            cosine_worker(args.shard, args.num_shards)
+        else:
+            sys.exit(subprocess.call(worker_command(args, args.shard)))
+    elif args.action == "merge":
+        merge(args)
+    else:
+        # Plain local processes stand in for nodes
+        procs = [
+            subprocess.Popen(worker_command(args, shard))
+            for shard in range(args.num_shards)
+        ]
+        failed = [shard for shard, p in enumerate(procs) if p.wait() != 0]
+        if failed:
+            sys.exit(f"Shards failed: {failed}")
+        merge(args)
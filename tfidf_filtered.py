@@ -0,0 +1,162 @@
+import os
+import argparse
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.preprocessing import normalize
+
+# Training-free similarity baseline: TF-IDF and BM25 vectors for every opinion,
+# built from the shared tokens in one sparse pass. Pair similarities are
+# row-wise dot products of the L2-normalized vectors (i.e. cosine similarity).
+
+output_dir = "results_filtered/tfidf/"
+
+
+def build_corpus(pair_tokens_df):
+    """
+    One document per distinct opinion: a case's majority is repeated once per
+    dissent in the pair table but is added to the corpus only once, so it does
+    not inflate document frequencies, the mean BM25 document length or top-k
+    neighbour lists. Also returns the majority and dissent row of every pair.
+    """
+    corpus, case_keys, opinion_labels = [], [], []
+    majority_row = {}
+    majority_rows = np.empty(len(pair_tokens_df), dtype=np.int64)
+    dissent_rows = np.empty(len(pair_tokens_df), dtype=np.int64)
+
+    for i, row in enumerate(pair_tokens_df.itertuples(index=False)):
+        if row.case_key not in majority_row:
+            majority_row[row.case_key] = len(corpus)
+            corpus.append(row.majority_tokens)
+            case_keys.append(row.case_key)
+            opinion_labels.append("majority")
+        majority_rows[i] = majority_row[row.case_key]
+        dissent_rows[i] = len(corpus)
+        corpus.append(row.dissent_tokens)
+        case_keys.append(row.case_key)
+        opinion_labels.append(f"dissent{row.dissent_ind}")
+
+    document_mapping_df = pd.DataFrame({
+        "index": np.arange(len(corpus)),
+        "case_key": case_keys,
+        "opinion_label": opinion_labels,
+    })
+    return corpus, document_mapping_df, majority_rows, dissent_rows
+
+
+def tfidf_matrix(counts):
+    """L2-normalized TF-IDF with sublinear tf and smoothed idf."""
+    n_docs = counts.shape[0]
+    df = np.bincount(counts.indices, minlength=counts.shape[1])
+    idf = np.log((1 + n_docs) / (1 + df)) + 1
+
+    weights = counts.astype(np.float64)
+    weights.data = (1 + np.log(weights.data)) * idf[weights.indices]
+    return normalize(weights, norm="l2", copy=False)
+
+
+def bm25_matrix(counts, doc_len, k1=1.2, b=0.75):
+    """
+    L2-normalized Okapi BM25 term weights. `doc_len` is the full token count of
+    each document, before vocabulary pruning (min_df) drops rare terms.
+    """
+    n_docs = counts.shape[0]
+    df = np.bincount(counts.indices, minlength=counts.shape[1])
+    idf = np.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+
+    doc_len = np.asarray(doc_len, dtype=np.float64)
+    length_norm = k1 * (1 - b + b * doc_len / max(doc_len.mean(), 1))
+    # Row of every stored entry, so the per-document length norm lines up with `data`
+    rows = np.repeat(np.arange(n_docs), np.diff(counts.indptr))
+
+    weights = counts.astype(np.float64)
+    tf = weights.data
+    weights.data = idf[weights.indices] * tf * (k1 + 1) / (tf + length_norm[rows])
+    return normalize(weights, norm="l2", copy=False)
+
+
+def pair_similarities(matrix, left, right):
+    """Row-wise dot product matrix[left[i]] . matrix[right[i]] for all i at once."""
+    return np.asarray(matrix[left].multiply(matrix[right]).sum(axis=1)).ravel()
+
+
+def top_k_similar(matrix, query_rows, k, exclude=None, batch_size=256):
+    """
+    Indices and similarities of the k most similar documents in the corpus for
+    each query row. `exclude(query_row, candidate_rows)` may return a boolean
+    mask of candidates to drop (e.g. documents from the same case).
+    """
+    neighbours = np.full((len(query_rows), k), -1, dtype=np.int64)
+    similarities = np.full((len(query_rows), k), np.nan)
+
+    for start in range(0, len(query_rows), batch_size):
+        batch = query_rows[start:start + batch_size]
+        scores = (matrix[batch] @ matrix.T).toarray()
+        for j, row in enumerate(batch):
+            row_scores = scores[j]
+            row_scores[row] = -np.inf
+            if exclude is not None:
+                row_scores[exclude(row, np.arange(len(row_scores)))] = -np.inf
+            top = np.argpartition(-row_scores, min(k, len(row_scores) - 1))[:k]
+            top = top[np.argsort(-row_scores[top], kind="stable")]
+            top = top[np.isfinite(row_scores[top])]
+            neighbours[start + j, :len(top)] = top
+            similarities[start + j, :len(top)] = row_scores[top]
+    return neighbours, similarities
+
+
+def save_pair_scores(name, scores, document_mapping_df, left, right):
+    np.save(os.path.join(output_dir, f"{name}_similarities.npy"), scores)
+    metadata_df = pd.DataFrame({
+        "case_key": document_mapping_df["case_key"].to_numpy()[left],
+        "majority_opinion_label": document_mapping_df["opinion_label"].to_numpy()[left],
+        "dissent_opinion_label": document_mapping_df["opinion_label"].to_numpy()[right],
+        f"{name}_similarity": scores,
+    })
+    metadata_df.to_csv(os.path.join(output_dir, f"{name}_similarity_metadata.csv"), index=False)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--min-df", type=int, default=2)
+    parser.add_argument("--top-k", type=int, default=0,
+                        help="Also write the k most similar opinions from other cases for every opinion")
+    args = parser.parse_args()
+
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Load shared tokens of `pair_metadata.csv` (written by preprocess_filtered.py)
+    pair_tokens_df = pd.read_pickle("results_filtered/pair_tokens.pkl")
+    corpus, document_mapping_df, majority_rows, dissent_rows = build_corpus(pair_tokens_df)
+    document_mapping_df.to_csv(os.path.join(output_dir, "document_mapping.csv"), index=False)
+
+    # Documents are already token lists, so the analyzer is the identity
+    vectorizer = CountVectorizer(analyzer=lambda tokens: tokens, min_df=args.min_df)
+    counts = vectorizer.fit_transform(corpus).tocsr()
+    counts.sort_indices()
+    print("Document-term matrix:", counts.shape, "nnz:", counts.nnz)
+
+    matrices = {"tfidf": tfidf_matrix(counts), "bm25": bm25_matrix(counts, [len(tokens) for tokens in corpus])}
+    for name, matrix in matrices.items():
+        scores = pair_similarities(matrix, majority_rows, dissent_rows)
+        save_pair_scores(name, scores, document_mapping_df, majority_rows, dissent_rows)
+        print(f"{name}_similarity_metadata.csv saved with {len(scores)} pairs")
+
+    if args.top_k > 0:
+        case_keys = document_mapping_df["case_key"].to_numpy()
+        same_case = lambda row, candidates: case_keys[candidates] == case_keys[row]
+        all_rows = np.arange(counts.shape[0])
+        for name, matrix in matrices.items():
+            neighbours, similarities = top_k_similar(matrix, all_rows, args.top_k, exclude=same_case)
+            found = neighbours >= 0
+            query_rows = np.repeat(all_rows, args.top_k).reshape(neighbours.shape)[found]
+            top_k_df = pd.DataFrame({
+                "case_key": case_keys[query_rows],
+                "opinion_label": document_mapping_df["opinion_label"].to_numpy()[query_rows],
+                "rank": np.tile(np.arange(1, args.top_k + 1), len(all_rows)).reshape(neighbours.shape)[found],
+                "neighbour_case_key": case_keys[neighbours[found]],
+                "neighbour_opinion_label": document_mapping_df["opinion_label"].to_numpy()[neighbours[found]],
+                f"{name}_similarity": similarities[found],
+            })
+            top_k_df.to_csv(os.path.join(output_dir, f"{name}_top_{args.top_k}.csv"), index=False)
+            print(f"{name}_top_{args.top_k}.csv saved with shape:", top_k_df.shape)
@@ -0,0 +1,94 @@
+import os
+import numpy as np
+from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
+from sklearn.decomposition import LatentDirichletAllocation, NMF
+
+# Topic-model engines for topic_model_filtered.py. Every backend returns the same
+# pieces (vectorizer, fitted model, topic-word weights, per-document topic
+# distributions that sum to 1), so the output files and KL scores keep their format.
+#
+#   lda            sklearn batch variational LDA (the original baseline)
+#   online-lda     sklearn online variational LDA, E-step spread over all cores
+#   lda-multicore  gensim LdaMulticore (online LDA with worker processes)
+#   nmf            NMF on TF-IDF weights, rows of W normalized to distributions
+
+BACKENDS = ["lda", "online-lda", "lda-multicore", "nmf"]
+
+# Backends whose fitted model transforms each document independently of the others,
+# so sharding.py can re-run inference per shard and still match the single-node scores
+ROW_INDEPENDENT_BACKENDS = {"lda", "online-lda"}
+
+
+def topic_model_dir(backend, num_components, root="results_filtered"):
+    """Output directory of a run; the baseline keeps its original name."""
+    if backend == "lda":
+        return f"{root}/topic_model_{num_components}/"
+    return f"{root}/topic_model_{backend}_{num_components}/"
+
+
+def _count_vectorizer():
+    return CountVectorizer(stop_words='english', max_df=0.9, min_df=5)
+
+
+def _normalize_rows(weights):
+    """Rows as probability distributions; all-zero rows become uniform."""
+    weights = np.asarray(weights, dtype=np.float64)
+    totals = weights.sum(axis=1, keepdims=True)
+    uniform = np.full_like(weights, 1.0 / weights.shape[1])
+    return np.where(totals > 0, weights / np.where(totals > 0, totals, 1), uniform)
+
+
+def fit_topic_model(backend, corpus, num_components, random_state=42):
+    """
+    Fit `backend` on the preprocessed `corpus` (list of space-joined tokens).
+    Returns (vectorizer, model, topic_word, topic_distributions).
+    """
+    if backend == "lda":
+        vectorizer = _count_vectorizer()
+        doc_term_matrix = vectorizer.fit_transform(corpus)
+        # Same row layout as vectorizer.transform, so shard workers (sharding.py) reproduce the scores exactly
+        doc_term_matrix.sort_indices()
+        model = LatentDirichletAllocation(n_components=num_components, random_state=random_state)
+        model.fit(doc_term_matrix)
+        return vectorizer, model, model.components_, model.transform(doc_term_matrix)
+
+    if backend == "online-lda":
+        vectorizer = _count_vectorizer()
+        doc_term_matrix = vectorizer.fit_transform(corpus)
+        doc_term_matrix.sort_indices()
+        model = LatentDirichletAllocation(
+            n_components=num_components, learning_method="online", batch_size=256,
+            max_iter=10, n_jobs=-1, random_state=random_state,
+        )
+        model.fit(doc_term_matrix)
+        return vectorizer, model, model.components_, model.transform(doc_term_matrix)
+
+    if backend == "lda-multicore":
+        from gensim.matutils import Sparse2Corpus
+        from gensim.models import LdaMulticore
+
+        vectorizer = _count_vectorizer()
+        doc_term_matrix = vectorizer.fit_transform(corpus).tocsr()
+        bow_corpus = Sparse2Corpus(doc_term_matrix, documents_columns=False)
+        id2word = dict(enumerate(vectorizer.get_feature_names_out()))
+        model = LdaMulticore(
+            bow_corpus, num_topics=num_components, id2word=id2word, passes=2, chunksize=2000,
+            workers=max(1, (os.cpu_count() or 2) - 1), random_state=random_state,
+        )
+        # Variational posterior of every document, in chunks, as topic proportions
+        gammas = []
+        bow_docs = list(bow_corpus)
+        for start in range(0, len(bow_docs), 2000):
+            gamma, _ = model.inference(bow_docs[start:start + 2000])
+            gammas.append(gamma)
+        topic_distributions = _normalize_rows(np.vstack(gammas)) if gammas else np.zeros((0, num_components))
+        return vectorizer, model, model.get_topics(), topic_distributions
+
+    if backend == "nmf":
+        vectorizer = TfidfVectorizer(stop_words='english', max_df=0.9, min_df=5, sublinear_tf=True)
+        tfidf_matrix = vectorizer.fit_transform(corpus)
+        model = NMF(n_components=num_components, init="nndsvda", max_iter=300, random_state=random_state)
+        doc_weights = model.fit_transform(tfidf_matrix)
+        return vectorizer, model, model.components_, _normalize_rows(doc_weights)
+
+    raise ValueError(f"Unknown topic backend {backend!r}; choose from {BACKENDS}")
@@ -1,63 +1,39 @@
 import json
 import re
 import pandas as pd
-from sklearn.feature_extraction.text import CountVectorizer
-from sklearn.decomposition import LatentDirichletAllocation
 from sklearn.metrics.pairwise import cosine_similarity
 from scipy.spatial.distance import jensenshannon
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
-from nltk.stem import WordNetLemmatizer
-import nltk
 import numpy as np
 from tqdm import tqdm
-from scipy.special import kl_div
 import plotly.express as px
 import os
+import time
+import pickle
+import argparse
+from topic_utils import preprocess_text, compute_kl_divergence
+from topic_backends import BACKENDS, fit_topic_model, topic_model_dir
+from memory_monitor import PeakMemory
 
+parser = argparse.ArgumentParser()
+parser.add_argument("--num-components", type=int, nargs="+", default=[90, 95, 105, 110])
+parser.add_argument("--backend", choices=BACKENDS, default="lda",
+                    help="Topic-model engine (see topic_backends.py); lda is the original baseline")
+parser.add_argument("--output-root", default="results_filtered", help="Directory holding the topic_model_* runs")
+parser.add_argument("--isolated", action="store_true",
+                    help="Record in fit_stats.json that nothing else ran during the fit (set by compare_topic_backends.py)")
+args = parser.parse_args()
 
-for num_components in [90,95,105,110]:
+# Preprocessing does not depend on the number of topics, so do it once
+pair_metadata_df = pd.read_pickle("results_filtered/pair_tokens.pkl")
+pair_metadata_df["majority_text"] = pair_metadata_df["majority_topic_tokens"].apply(preprocess_text)
+pair_metadata_df["dissent_text"] = pair_metadata_df["dissent_topic_tokens"].apply(preprocess_text)
+
+
+for num_components in args.num_components:
     
-    output_dir = f"results_filtered/topic_model_{num_components}/"
+    output_dir = topic_model_dir(args.backend, num_components, args.output_root)
     os.makedirs(output_dir, exist_ok=True)
     
-    # Download necessary NLTK resources
-    nltk.download('punkt')
-    nltk.download('stopwords')
-    nltk.download('wordnet')
-    
-    # Initialize tools
-    stop_words = set(stopwords.words('english'))
-    lemmatizer = WordNetLemmatizer()
-    
-    
-    
-    def preprocess_text(text):
-        text = text.lower()
-        tokens = word_tokenize(text)
-        tokens = [
-            word for word in tokens 
-            if word.isalnum() and 
-               not any(char.isdigit() for char in word) and 
-               re.fullmatch(r"[a-zA-Z]+", word) and 
-               word not in stop_words
-        ]
-        tokens = [lemmatizer.lemmatize(word) for word in tokens]
-        return " ".join(tokens)
-    
-    def compute_kl_divergence(p, q):
-        p = np.array(p)
-        q = np.array(q)
-        epsilon = 1e-10
-        p = (p + epsilon) / np.sum(p + epsilon)
-        q = (q + epsilon) / np.sum(q + epsilon)
-        return np.sum(kl_div(p, q))
-    
-    
-    pair_metadata_df = pd.read_csv("results_filtered/pair_metadata.csv")
-    pair_metadata_df["majority_text"] = pair_metadata_df["majority_text"].apply(preprocess_text)
-    pair_metadata_df["dissent_text"] = pair_metadata_df["dissent_text"].apply(preprocess_text)
-    
     # Create Corpus and Opinion Label Mapping
     corpus = []
     document_mapping = []
@@ -83,23 +59,18 @@ for num_components in [90,95,105,110]:
     document_mapping_df = pd.DataFrame(document_mapping, columns=["index", "case_key", "opinion_label"])
     document_mapping_df.to_csv(os.path.join(output_dir, "document_mapping.csv"), index=False)
     
-    # Topic Modeling
-    vectorizer = CountVectorizer(stop_words='english', max_df=0.9, min_df=5)
-    doc_term_matrix = vectorizer.fit_transform(corpus)
-    
-    # Apply LDA
-    lda = LatentDirichletAllocation(n_components=num_components, random_state=42)
-    lda.fit(doc_term_matrix)
-    
-    # Get topic distributions
-    topic_distributions = lda.transform(doc_term_matrix)
+    # Topic Modeling (fit and get topic distributions)
+    with PeakMemory() as fit_memory:
+        fit_start = time.perf_counter()
+        vectorizer, model, topic_word, topic_distributions = fit_topic_model(args.backend, corpus, num_components)
+        fit_seconds = time.perf_counter() - fit_start
     
     # Get vocabulary
     vocabulary = vectorizer.get_feature_names_out()
-    topic_names = [f"Topic {i}" for i in range(lda.n_components)]
+    topic_names = [f"Topic {i}" for i in range(num_components)]
     
     # Create DataFrames
-    topic_word_distributions = pd.DataFrame(lda.components_, columns=vocabulary, index=topic_names)
+    topic_word_distributions = pd.DataFrame(topic_word, columns=vocabulary, index=topic_names)
     document_topic_distributions = pd.DataFrame(topic_distributions, columns=topic_names)
     
     # Add `case_key` and `opinion_label` columns
@@ -135,4 +106,22 @@ for num_components in [90,95,105,110]:
     kl_divergence_df.to_csv(os.path.join(output_dir, "kl_divergence_metadata.csv"), index=False)
     
     # Save topic distributions as .npy
-    np.save(os.path.join(output_dir, "topic_distributions.npy"), topic_distributions)
\ No newline at end of file
+    np.save(os.path.join(output_dir, "topic_distributions.npy"), topic_distributions)
+
+    # Save the fitted model so inference can be re-run on shards of the pairs
+    with open(os.path.join(output_dir, "topic_model.pkl"), "wb") as f:
+        pickle.dump({"backend": args.backend, "vectorizer": vectorizer, "model": model}, f)
+    
+    # Fit cost, for compare_topic_backends.py (PSS of this process and its workers)
+    to_mb = lambda size: size / 2**20 if size is not None else None
+    with open(os.path.join(output_dir, "fit_stats.json"), "w") as f:
+        json.dump({
+            "backend": args.backend,
+            "num_components": num_components,
+            "documents": len(corpus),
+            "vocabulary": len(vocabulary),
+            "fit_seconds": fit_seconds,
+            "pss_before_fit_mb": to_mb(fit_memory.before),
+            "peak_pss_mb": to_mb(fit_memory.peak),
+            "isolated": args.isolated,
+        }, f, indent=2)
\ No newline at end of file
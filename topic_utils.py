@@ -0,0 +1,37 @@
+import re
+import nltk
+import numpy as np
+from nltk.corpus import stopwords
+from nltk.stem import WordNetLemmatizer
+from scipy.special import kl_div
+
+# Preprocessing and divergence shared by topic_model_filtered.py and the
+# sharded KL workers in sharding.py, so both produce identical scores.
+
+# Download necessary NLTK resources
+nltk.download('stopwords')
+nltk.download('wordnet')
+
+# Initialize tools
+stop_words = set(stopwords.words('english'))
+lemmatizer = WordNetLemmatizer()
+
+
+def preprocess_text(tokens):
+    # `tokens` are the topic-model tokens from preprocess_filtered.py
+    # (word_tokenize of the lowercased text, as the original topic model did)
+    tokens = [
+        word for word in tokens
+        if re.fullmatch(r"[a-zA-Z]+", word) and
+           word not in stop_words
+    ]
+    tokens = [lemmatizer.lemmatize(word) for word in tokens]
+    return " ".join(tokens)
+
+def compute_kl_divergence(p, q):
+    p = np.array(p)
+    q = np.array(q)
+    epsilon = 1e-10
+    p = (p + epsilon) / np.sum(p + epsilon)
+    q = (q + epsilon) / np.sum(q + epsilon)
+    return np.sum(kl_div(p, q))